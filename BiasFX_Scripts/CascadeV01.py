@@ -1,5 +1,20 @@
 import MetaTrader5 as mt5
+import numpy as np
+import asyncio
+import functools
+import signal
+import threading
 import time
+import traceback
+from Stage1_DataCollection import collect_data
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional, the helpers then run as plain Python/NumPy
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
 
 # Constants for lot size calculation
 ATR_HEDGE_DISTANCE = 1.0  # Percentage of ATR distance for hedging
@@ -9,6 +24,26 @@ PERCENTAGE_MAXIMUM_CAPACITY = 100  # Percentage of maximum capacity
 SLIPPAGE = 10  # Slippage in points
 MAGIC_NUMBER = 123456  # Magic number for identifying trades
 ATR_MULTIPLIER = 1.0  # Multiplier for ATR-based distances
+TRAILING_STEP = 0.0001  # Price step by which the trailing stop is moved
+
+# Order request fields shared by every market and pending order
+ORDER_REQUEST_TEMPLATE = {
+    "slippage": SLIPPAGE,
+    "magic": MAGIC_NUMBER,
+    "comment": "Hedging Logic",
+    "type_time": mt5.ORDER_TIME_GTC,
+    "type_filling": mt5.ORDER_FILLING_IOC,
+}
+
+# Polling parameters
+MIN_POLL_INTERVAL = 0.25  # Seconds between polls right after activity
+MAX_POLL_INTERVAL = 5.0  # Upper bound for the backoff between polls
+SYMBOL_INFO_REFRESH_INTERVAL = 60  # Seconds before cached symbol info (spread) is refreshed
+ATR_REFRESH_INTERVAL = 60  # Seconds between background ATR refreshes
+DATA_COLLECTION_INTERVAL = 3600  # Seconds between Stage 1 data collection runs
+
+# Latest daily ATR of every symbol in use, kept up to date by the refresh thread
+atr_cache = {}
 
 def initialize_mt5():
     """Initialize MetaTrader 5 connection."""
@@ -48,18 +83,51 @@ def validate_symbol(symbol):
     return matched_symbol
 
 
-def get_daily_atr(symbol):
-    """Calculate ATR for the daily timeframe."""
-    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 0, 14)
-    if rates is None or len(rates) < 14:
+def fetch_daily_atr(symbol, period=14):
+    """Calculate ATR for the daily timeframe using the true range."""
+    # One extra bar is needed for the previous close of the oldest bar
+    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 0, period + 1)
+    if rates is None or len(rates) < period + 1:
         print("Error fetching rates for ATR calculation")
         return None
-    highs = [rate['high'] for rate in rates]
-    lows = [rate['low'] for rate in rates]
-    atr = sum([h - l for h, l in zip(highs, lows)]) / len(highs)
+    return float(compute_atr(rates['high'], rates['low'], rates['close']))
+
+# Compiled eagerly at import with an explicit signature; rates fields are strided views
+@njit("f8(f8[:], f8[:], f8[:])", cache=True)
+def compute_atr(highs, lows, closes):
+    """Average the true range of every bar but the first, which only provides a previous close."""
+    prev_closes = closes[:-1]
+    highs = highs[1:]
+    lows = lows[1:]
+    true_ranges = np.maximum(np.maximum(highs - lows, np.abs(highs - prev_closes)),
+                             np.abs(lows - prev_closes))
+    return true_ranges.mean()
+
+def get_daily_atr(symbol):
+    """Return the cached daily ATR, fetching it synchronously on first access."""
+    atr = atr_cache.get(symbol)
+    if atr is None:
+        atr = fetch_daily_atr(symbol)
+        if atr is not None:
+            atr_cache[symbol] = atr
     return atr
 
-def maximum_capacity_lot_size(symbol):
+def refresh_atr_loop():
+    """Periodically refresh the daily ATR of every symbol in the cache."""
+    while True:
+        time.sleep(ATR_REFRESH_INTERVAL)
+        for symbol in list(atr_cache):
+            atr = fetch_daily_atr(symbol)
+            if atr is not None:
+                atr_cache[symbol] = atr
+
+def start_atr_refresh():
+    """Start the background thread that keeps the ATR cache up to date."""
+    thread = threading.Thread(target=refresh_atr_loop, daemon=True)
+    thread.start()
+    return thread
+
+def maximum_capacity_lot_size(symbol, symbol_info=None):
     """Calculate the maximum capacity lot size for the given symbol."""
     account_info = mt5.account_info()
     if account_info is None:
@@ -67,6 +135,8 @@ def maximum_capacity_lot_size(symbol):
         return 0
     account_leverage = account_info.leverage
 
+    if symbol_info is None:
+        symbol_info = mt5.symbol_info(symbol)
     current_price = mt5.symbol_info_tick(symbol).ask
     cost_per_lot_current = 1000000 * current_price
 
@@ -75,7 +145,7 @@ def maximum_capacity_lot_size(symbol):
     hedge_price = current_price - hedge_distance
     cost_per_lot_hedge = 1000000 * hedge_price
 
-    point = mt5.symbol_info(symbol).point
+    point = symbol_info.point
     pip_value = (point * 1000000) / current_price
     equity_loss_at_hedge = hedge_distance * pip_value
     initial_equity = account_info.equity
@@ -89,9 +159,9 @@ def maximum_capacity_lot_size(symbol):
     max_lots_each_position = max_combined_lots / 2
     imax_lots_each_position = max_lots_each_position * (PERCENTAGE_MAXIMUM_CAPACITY / 100)
 
-    max_allowed_lot_size = mt5.symbol_info(symbol).volume_max
-    min_allowed_lot_size = mt5.symbol_info(symbol).volume_min
-    volume_step = mt5.symbol_info(symbol).volume_step
+    max_allowed_lot_size = symbol_info.volume_max
+    min_allowed_lot_size = symbol_info.volume_min
+    volume_step = symbol_info.volume_step
 
     if imax_lots_each_position > max_allowed_lot_size:
         imax_lots_each_position = max_allowed_lot_size
@@ -103,22 +173,18 @@ def maximum_capacity_lot_size(symbol):
     print(f"Final adjusted lot size to be used: {imax_lots_each_position:.2f}")
     return imax_lots_each_position
 
-def place_market_order(symbol, action):
-    """Place a market order with calculated lot size."""
-    lot_size = maximum_capacity_lot_size(symbol)
+def place_market_order(symbol, action, lot_size):
+    """Place a market order with the given lot size."""
     print(f"Attempting to place a market order with lot size: {lot_size:.2f}")
     order_type = mt5.ORDER_TYPE_BUY if action == "BUY" else mt5.ORDER_TYPE_SELL
+    tick = mt5.symbol_info_tick(symbol)
     request = {
+        **ORDER_REQUEST_TEMPLATE,
         "action": mt5.TRADE_ACTION_DEAL,
         "symbol": symbol,
         "volume": lot_size,
         "type": order_type,
-        "price": mt5.symbol_info_tick(symbol).ask if action == "BUY" else mt5.symbol_info_tick(symbol).bid,
-        "slippage": SLIPPAGE,
-        "magic": MAGIC_NUMBER,
-        "comment": "Hedging Logic",
-        "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
+        "price": tick.ask if action == "BUY" else tick.bid,
     }
     result = mt5.order_send(request)
     if result.retcode != mt5.TRADE_RETCODE_DONE:
@@ -127,22 +193,17 @@ def place_market_order(symbol, action):
         print(f"Market order placed: {result}")
     return result
 
-def place_pending_order(symbol, action, price):
-    """Place a pending order with calculated lot size."""
-    lot_size = maximum_capacity_lot_size(symbol)
+def place_pending_order(symbol, action, lot_size, price):
+    """Place a pending order with the given lot size."""
     print(f"Attempting to place a pending {action} order with lot size: {lot_size:.2f}")
     order_type = mt5.ORDER_TYPE_BUY_STOP if action == "BUY_STOP" else mt5.ORDER_TYPE_SELL_STOP
     request = {
+        **ORDER_REQUEST_TEMPLATE,
         "action": mt5.TRADE_ACTION_PENDING,
         "symbol": symbol,
         "volume": lot_size,
         "type": order_type,
         "price": price,
-        "slippage": SLIPPAGE,
-        "magic": MAGIC_NUMBER,
-        "comment": "Hedging Logic",
-        "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
     }
     result = mt5.order_send(request)
     if result.retcode != mt5.TRADE_RETCODE_DONE:
@@ -151,6 +212,23 @@ def place_pending_order(symbol, action, price):
         print(f"Pending order placed: {result}")
     return result
 
+def order_succeeded(result):
+    """Tell whether an order_send result reports a completed request."""
+    return result is not None and result.retcode == mt5.TRADE_RETCODE_DONE
+
+def next_poll_interval(interval, activity):
+    """Reset the polling interval on activity, otherwise back off exponentially."""
+    if activity:
+        return MIN_POLL_INTERVAL
+    return min(interval * 2, MAX_POLL_INTERVAL)
+
+def get_tick_time_msc(symbol):
+    """Return the time of the last tick in milliseconds, or None if unavailable."""
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        return None
+    return tick.time_msc
+
 def check_orders_exist(symbol):
     """Check if there are any open orders or positions for the given symbol."""
     positions = mt5.positions_get(symbol=symbol)
@@ -160,7 +238,19 @@ def check_orders_exist(symbol):
         return False
     return True
 
-def trend_following_buy_strategy(symbol, bias):
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking MetaTrader 5 call in the default executor without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+async def cancel_orders(tickets):
+    """Remove the given pending orders, sending the remove requests concurrently."""
+    return await asyncio.gather(*(
+        run_blocking(mt5.order_send, {"action": mt5.TRADE_ACTION_REMOVE, "order": ticket})
+        for ticket in tickets
+    ))
+
+async def trend_following_buy_strategy(symbol, bias, info, info_time):
     """Execute trend-following buy strategy when Bias is 0."""
     if bias != 0:
         print("Bias is not 0. Exiting strategy.")
@@ -168,129 +258,293 @@ def trend_following_buy_strategy(symbol, bias):
     
     print("Starting trend-following buy strategy...")
 
-    atr = get_daily_atr(symbol)
+    atr = await run_blocking(get_daily_atr, symbol)
     if atr is None:
         print("Failed to calculate ATR. Exiting strategy.")
         return
-    spread = mt5.symbol_info(symbol).spread * mt5.symbol_info(symbol).point
+    # The info may have been fetched long before the strategy started, so refresh it if stale
+    if time.monotonic() - info_time >= SYMBOL_INFO_REFRESH_INTERVAL:
+        info = await run_blocking(mt5.symbol_info, symbol)
+        info_time = time.monotonic()
+    point = info.point
+    spread = info.spread * point
     distance = atr + spread
 
+    interval = MIN_POLL_INTERVAL
+    last_tick_time_msc = None
+    last_position_count = None
     while True:
-        positions = mt5.positions_get(symbol=symbol)
-        
+        # Positions can only change on a new tick, so skip the round-trips until one arrives
+        tick_time_msc = await run_blocking(get_tick_time_msc, symbol)
+        if tick_time_msc is not None and tick_time_msc == last_tick_time_msc:
+            interval = next_poll_interval(interval, activity=False)
+            await asyncio.sleep(interval)
+            continue
+        last_tick_time_msc = tick_time_msc
+
+        positions = await run_blocking(mt5.positions_get, symbol=symbol)
+
         if len(positions) == 0:
             print("No open Buy positions. Exiting strategy.")
             break
 
+        interval = next_poll_interval(interval, activity=len(positions) != last_position_count)
+        last_position_count = len(positions)
+
         if len(positions) > 1:
             latest_position = positions[-1]
-            new_buy_stop_price = mt5.symbol_info_tick(symbol).ask + distance
-            new_buy_stop = place_pending_order(symbol, "BUY_STOP", new_buy_stop_price)
-            
+            # The spread drifts over time, so refresh it once the cached info gets old
+            if time.monotonic() - info_time >= SYMBOL_INFO_REFRESH_INTERVAL:
+                info = await run_blocking(mt5.symbol_info, symbol)
+                spread = info.spread * point
+                distance = atr + spread
+                info_time = time.monotonic()
+            tick = await run_blocking(mt5.symbol_info_tick, symbol)
+            new_buy_stop_price = tick.ask + distance
+            lot_size = await run_blocking(maximum_capacity_lot_size, symbol, info)
+            new_buy_stop = await run_blocking(place_pending_order, symbol, "BUY_STOP", lot_size, new_buy_stop_price)
+
+            # Track prices in whole points so the comparisons are exact integers
+            step_pts = max(1, round(TRAILING_STEP / point))
+            open_pts = round(latest_position.price_open / point)
+            # Start one step below break-even so the first update lands exactly on it
+            last_sl_pts = open_pts - step_pts
+
+            trailing_interval = MIN_POLL_INTERVAL
+            last_trailing_tick_time_msc = None
             while True:
-                current_price = mt5.symbol_info_tick(symbol).ask
-                trailing_stop_price = latest_position.price_open + 0.0001
-                
-                if current_price >= latest_position.price_open + 0.0001:
-                    trailing_stop_price = latest_position.price_open
-                    mt5.order_send({
+                tick = await run_blocking(mt5.symbol_info_tick, symbol)
+                if tick.time_msc == last_trailing_tick_time_msc:
+                    trailing_interval = next_poll_interval(trailing_interval, activity=False)
+                    await asyncio.sleep(trailing_interval)
+                    continue
+                last_trailing_tick_time_msc = tick.time_msc
+                trailing_interval = MIN_POLL_INTERVAL
+
+                current_price = tick.ask
+                # A Buy's stop loss triggers on the bid, so it trails the bid
+                bid_pts = round(tick.bid / point)
+
+                # The stop trails one step behind the price, starting at break-even,
+                # and is only sent when it moves by at least a full step
+                sl_pts = bid_pts - step_pts
+                if sl_pts - last_sl_pts >= step_pts:
+                    trailing_stop_price = round(sl_pts * point, info.digits)
+                    result = await run_blocking(mt5.order_send, {
                         "action": mt5.TRADE_ACTION_SLTP,
                         "position": latest_position.ticket,
                         "sl": trailing_stop_price
                     })
-                    print(f"Trailing stop moved to break-even at {trailing_stop_price}")
-                
-                if current_price >= trailing_stop_price + 0.0001:
-                    trailing_stop_price += 0.0001
-                    mt5.order_send({
-                        "action": mt5.TRADE_ACTION_SLTP,
-                        "position": latest_position.ticket,
-                        "sl": trailing_stop_price
-                    })
-                    print(f"Trailing stop moved up to {trailing_stop_price}")
+                    if not order_succeeded(result):
+                        print(f"Failed to move trailing stop to {trailing_stop_price}: "
+                              f"{result.comment if result else mt5.last_error()}")
+                    else:
+                        if sl_pts == open_pts:
+                            print(f"Trailing stop moved to break-even at {trailing_stop_price}")
+                        else:
+                            print(f"Trailing stop moved up to {trailing_stop_price}")
+                        last_sl_pts = sl_pts
 
                 if new_buy_stop and current_price >= new_buy_stop_price:
                     break
 
-                time.sleep(1)
+                await asyncio.sleep(trailing_interval)
 
-        if not check_orders_exist(symbol):
+        if not await run_blocking(check_orders_exist, symbol):
             print("All positions closed. Exiting strategy.")
             break
 
-        time.sleep(1)
+        await asyncio.sleep(interval)
 
     print("Trend-following buy strategy completed.")
 
-def monitor_pending_orders(symbol, bias):
+async def monitor_pending_orders(symbol, bias, info, info_time):
     """Monitor pending orders and handle hit orders."""
-    print("Monitoring orders created. Waiting for one of the orders to be triggered...")
+    print(f"Monitoring orders created for '{symbol}'. Waiting for one of the orders to be triggered...")
+    interval = MIN_POLL_INTERVAL
+    last_tick_time_msc = None
+    last_totals = None
     while True:
-        if not check_orders_exist(symbol):
+        # Pending orders can only trigger on a new tick, so skip the round-trips until one arrives
+        tick_time_msc = await run_blocking(get_tick_time_msc, symbol)
+        if tick_time_msc is not None and tick_time_msc == last_tick_time_msc:
+            interval = next_poll_interval(interval, activity=False)
+            await asyncio.sleep(interval)
+            continue
+        last_tick_time_msc = tick_time_msc
+
+        # The account-wide totals are cheap to query, so the per-symbol lists are fetched
+        # only when they change. Other symbols' strategies move the same totals and can
+        # mask a change for this symbol, so the lists are also fetched on every poll once
+        # the backoff has reached its cap
+        totals = (await run_blocking(mt5.positions_total), await run_blocking(mt5.orders_total))
+        if totals == (0, 0):
+            print(f"No active positions or orders for symbol '{symbol}'.")
+            break
+        interval = next_poll_interval(interval, activity=totals != last_totals)
+        if totals == last_totals and interval < MAX_POLL_INTERVAL:
+            await asyncio.sleep(interval)
+            continue
+        last_totals = totals
+
+        positions = await run_blocking(mt5.positions_get, symbol=symbol)
+        orders = await run_blocking(mt5.orders_get, symbol=symbol)
+        if not positions and not orders:
+            print(f"No active positions or orders for symbol '{symbol}'.")
             break
 
-        positions = mt5.positions_get(symbol=symbol)
-        orders = mt5.orders_get(symbol=symbol)
+        # Index positions and orders by type in a single pass each
+        pos_types = {pos.type for pos in positions}
+        order_tickets_by_type = {}
+        for order in orders:
+            order_tickets_by_type.setdefault(order.type, []).append(order.ticket)
 
         if len(positions) > 1:
-            if any(pos.type == mt5.ORDER_TYPE_BUY for pos in positions):
+            if mt5.ORDER_TYPE_BUY in pos_types:
                 print("Buy Stop hit, closing Sell Stop and initiating trend-following strategy.")
-                for order in orders:
-                    if order.type == mt5.ORDER_TYPE_SELL_STOP:
-                        mt5.order_send({"action": mt5.TRADE_ACTION_REMOVE, "order": order.ticket})
-                trend_following_buy_strategy(symbol, bias)
+                await cancel_orders(order_tickets_by_type.get(mt5.ORDER_TYPE_SELL_STOP, []))
+                await trend_following_buy_strategy(symbol, bias, info, info_time)
                 break
 
-        time.sleep(1)
-    print("Monitoring completed. Exiting.")
-
-def hedging_logic():
-    """Main hedging logic."""
-    initialize_mt5()
-    input_symbol = input("Enter the trading symbol (e.g., EURUSD, BTCUSD): ").strip().upper()
-    symbol = validate_symbol(input_symbol)  # Use the updated validate_symbol
-    if not symbol:
-        print("Exiting the program due to invalid symbol.")
-        mt5.shutdown()
-        return
+        await asyncio.sleep(interval)
+    print(f"Monitoring completed for '{symbol}'. Exiting.")
 
-    atr = get_daily_atr(symbol)
+async def hedging_logic(symbol):
+    """Main hedging logic for a single validated broker symbol."""
+    atr = await run_blocking(get_daily_atr, symbol)
     if atr is None:
         print("ATR calculation failed.")
-        mt5.shutdown()
         return
-    
-    spread = mt5.symbol_info(symbol).spread * mt5.symbol_info(symbol).point
+
+    info = await run_blocking(mt5.symbol_info, symbol)
+    info_time = time.monotonic()
+    point = info.point
+    spread = info.spread * point
     distance = atr + spread
 
+    # The lot size is computed once and shared by the three orders of the placement
+    lot_size = await run_blocking(maximum_capacity_lot_size, symbol, info)
+
     # Step 3: Open Buy Position
-    buy_order = place_market_order(symbol, "BUY")
-    if not buy_order:
+    buy_order = await run_blocking(place_market_order, symbol, "BUY", lot_size)
+    if not order_succeeded(buy_order):
         print("Failed to place initial Buy order.")
-        mt5.shutdown()
-        return
-
-    # Step 4: Place Pending Sell Stop
-    sell_stop_price = mt5.symbol_info_tick(symbol).bid - distance
-    sell_stop_order = place_pending_order(symbol, "SELL_STOP", sell_stop_price)
-    if not sell_stop_order:
-        print("Failed to place Pending Sell Stop.")
-        mt5.shutdown()
         return
 
-    # Step 5: Place Pending Buy Stop
-    buy_stop_price = mt5.symbol_info_tick(symbol).ask + distance
-    buy_stop_order = place_pending_order(symbol, "BUY_STOP", buy_stop_price)
-    if not buy_stop_order:
-        print("Failed to place Pending Buy Stop.")
-        mt5.shutdown()
+    # Step 4 and 5: Place Pending Sell Stop and Buy Stop concurrently
+    tick = await run_blocking(mt5.symbol_info_tick, symbol)
+    sell_stop_price = tick.bid - distance
+    buy_stop_price = tick.ask + distance
+    sell_stop_order, buy_stop_order = await asyncio.gather(
+        run_blocking(place_pending_order, symbol, "SELL_STOP", lot_size, sell_stop_price),
+        run_blocking(place_pending_order, symbol, "BUY_STOP", lot_size, buy_stop_price),
+    )
+
+    sell_stop_placed = order_succeeded(sell_stop_order)
+    buy_stop_placed = order_succeeded(buy_stop_order)
+    if not sell_stop_placed or not buy_stop_placed:
+        # Never leave a single pending leg working without the other one
+        tickets = []
+        if sell_stop_placed:
+            tickets.append(sell_stop_order.order)
+        else:
+            print("Failed to place Pending Sell Stop.")
+        if buy_stop_placed:
+            tickets.append(buy_stop_order.order)
+        else:
+            print("Failed to place Pending Buy Stop.")
+        for ticket, result in zip(tickets, await cancel_orders(tickets)):
+            if not order_succeeded(result):
+                print(f"Failed to cancel unhedged pending order {ticket}. Remove it manually.")
         return
 
     # Step 8: Monitor Orders until conditions in Point 6 or 7 are met
-    monitor_pending_orders(symbol, bias=0)
-    mt5.shutdown()
+    await monitor_pending_orders(symbol, bias=0, info=info, info_time=info_time)
+
+def parse_symbols(line):
+    """Split a comma-separated line into upper-case trading symbols."""
+    return [symbol.strip().upper() for symbol in line.split(",") if symbol.strip()]
+
+def read_symbols(loop, queue):
+    """Read trading symbols from standard input and hand them to the event loop's queue."""
+    while True:
+        try:
+            line = input("Enter the trading symbols separated by commas (e.g., EURUSD, BTCUSD): ")
+        except EOFError:
+            # No more input; None tells the service to stop once running symbols finish
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+            return
+        for symbol in parse_symbols(line):
+            loop.call_soon_threadsafe(queue.put_nowait, symbol)
+
+async def run_data_collection():
+    """Run the Stage 1 data collection periodically over the shared MT5 connection."""
+    while True:
+        # Wait first so the downloads do not compete with the first order placements
+        await asyncio.sleep(DATA_COLLECTION_INTERVAL)
+        try:
+            await run_blocking(collect_data)
+        except Exception:
+            print("Data collection failed, retrying at the next interval:")
+            traceback.print_exc()
+
+def finish_strategy(strategies, active_symbols, symbol, strategy):
+    """Release the symbol of a finished hedging task and report its error, if any."""
+    strategies.discard(strategy)
+    active_symbols.discard(symbol)
+    if strategy.cancelled():
+        return
+    exc = strategy.exception()
+    if exc is not None:
+        print(f"Hedging logic for '{symbol}' failed:")
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+async def run_service():
+    """Start the hedging logic for every symbol received, until the input is closed."""
+    queue = asyncio.Queue()
+    # A daemon thread is used so a pending input() never blocks the process from exiting
+    reader = threading.Thread(target=read_symbols, args=(asyncio.get_running_loop(), queue), daemon=True)
+    reader.start()
+    data_collection = asyncio.create_task(run_data_collection())
+
+    strategies = set()
+    # Broker symbols with a running strategy; two strategies on one symbol would
+    # share the magic number and cancel each other's orders
+    active_symbols = set()
+    while True:
+        input_symbol = await queue.get()
+        if input_symbol is None:
+            break
+        symbol = await run_blocking(validate_symbol, input_symbol)  # Use the updated validate_symbol
+        if not symbol:
+            print(f"Skipping '{input_symbol}' due to invalid symbol.")
+            continue
+        if symbol in active_symbols:
+            print(f"Skipping '{symbol}': a strategy is already running on it.")
+            continue
+        active_symbols.add(symbol)
+        strategy = asyncio.create_task(hedging_logic(symbol))
+        strategies.add(strategy)
+        strategy.add_done_callback(functools.partial(finish_strategy, strategies, active_symbols, symbol))
+
+    # Errors are already reported by finish_strategy
+    await asyncio.gather(*strategies, return_exceptions=True)
+    data_collection.cancel()
+
+def handle_sigterm(signum, frame):
+    """Turn SIGTERM into SystemExit so the service shuts MT5 down cleanly."""
+    raise SystemExit(0)
+
+def main():
+    """Run the hedging service over a single long-lived MT5 connection."""
+    initialize_mt5()
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    start_atr_refresh()
+    try:
+        asyncio.run(run_service())
+    finally:
+        mt5.shutdown()
 
 
 if __name__ == "__main__":
-    hedging_logic()
-    mt5.shutdown()
+    main()
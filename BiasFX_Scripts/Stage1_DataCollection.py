@@ -1,7 +1,9 @@
 import MetaTrader5 as mt5
-import pandas as pd
+import numpy as np
+import csv
+import io
 import os
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 # Define the base currency pairs (without suffixes)
 BASE_CURRENCY_PAIRS = [
@@ -24,8 +26,24 @@ TIMEFRAMES = {
     "MN1": mt5.TIMEFRAME_MN1
 }
 
-# Update OUTPUT_FOLDER to BiasFX_Data
-OUTPUT_FOLDER = "../BiasFX_Data"
+# Number of bars covering the last day for each timeframe
+BARS_PER_DAY = {
+    "M1": 1440,
+    "M5": 288,
+    "M15": 96,
+    "M30": 48,
+    "H1": 24,
+    "H4": 6,
+    "D1": 1,
+    "W1": 1,
+    "MN1": 1
+}
+
+# Update OUTPUT_FOLDER to BiasFX_Data, resolved next to this script rather than the working directory
+OUTPUT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "BiasFX_Data")
+
+# Number of symbol/timeframe downloads running at the same time
+MAX_WORKERS = 8
 
 def connect_mt5():
     """Connect to MT5."""
@@ -47,46 +65,69 @@ def map_symbols(base_pairs, full_symbols):
     :param full_symbols: List of all symbols available in the broker
     :return: Dictionary mapping base pairs to full symbols
     """
-    mapped_symbols = {}
-    for base in base_pairs:
-        for full in full_symbols:
-            if full.startswith(base):
-                mapped_symbols[base] = full
-                break
-    return mapped_symbols
-
-def fetch_data(symbol, timeframe, days=1):
+    # Index the broker symbols by their 6-character pair prefix, keeping the first match
+    prefix_index = {}
+    for full in full_symbols:
+        prefix_index.setdefault(full[:6], full)
+    return {base: prefix_index[base] for base in base_pairs if base in prefix_index}
+
+def fetch_data(symbol, timeframe, count=1440):
     """
-    Fetch historical OHLC data for a given symbol and timeframe.
+    Fetch the most recent OHLC bars for a given symbol and timeframe.
     :param symbol: Symbol name (e.g., "EURUSD")
     :param timeframe: MT5 Timeframe constant
-    :param days: Number of days of historical data to fetch
-    :return: Pandas DataFrame with OHLC and tick volume
+    :param count: Number of bars to fetch, counting back from the current bar
+    :return: NumPy structured array with OHLC and tick volume
     """
-    utc_from = datetime.now() - timedelta(days=days)
-    utc_to = datetime.now()
-    rates = mt5.copy_rates_range(symbol, timeframe, utc_from, utc_to)
+    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
     if rates is None:
         print(f"Failed to fetch data for {symbol} on {timeframe}: {mt5.last_error()}")
         return None
-    df = pd.DataFrame(rates)
-    return df
+    return rates
 
-def save_csv(dataframe, filepath):
+def format_times(epoch_seconds):
+    """
+    Format bar open times the way the CSV files store them.
+    :param epoch_seconds: Array of bar open times in seconds since the epoch
+    :return: List of strings, date-only when every bar opens at midnight
+    """
+    times = epoch_seconds.astype("datetime64[s]")
+    unit = "D" if np.all(times == times.astype("datetime64[D]")) else "s"
+    # Replace per string, np.char.replace fails on empty arrays with NumPy 2
+    return [time.replace("T", " ") for time in np.datetime_as_string(times, unit=unit).tolist()]
+
+def save_csv(rates, filepath):
     """
     Save data to a CSV file.
-    :param dataframe: DataFrame to save
+    :param rates: NumPy structured array returned by fetch_data
     :param filepath: File path to save the data
     """
-    dataframe["time"] = pd.to_datetime(dataframe["time"], unit="s")
-    dataframe = dataframe[["time", "open", "high", "low", "close", "tick_volume"]]
-    dataframe.to_csv(filepath, index=False)
-
-def main():
-    """Main function to fetch and save data."""
-    if not connect_mt5():
-        return
-
+    columns = ["open", "high", "low", "close", "tick_volume"]
+    # Render the whole file in memory and write it to disk in one go
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["time"] + columns)
+    writer.writerows(zip(format_times(rates["time"]),
+                         *(rates[column].tolist() for column in columns)))
+    with open(filepath, "w", newline="") as f:
+        f.write(buffer.getvalue())
+
+def fetch_and_save(full_symbol, tf_name, tf_value, filepath):
+    """
+    Fetch the data for one symbol and timeframe and save it to a CSV file.
+    :param full_symbol: Symbol name as known by the broker
+    :param tf_name: Timeframe name (e.g., "M1")
+    :param tf_value: MT5 Timeframe constant
+    :param filepath: File path to save the data
+    """
+    print(f"Fetching {full_symbol} data for {tf_name}")
+    rates = fetch_data(full_symbol, tf_value, count=BARS_PER_DAY[tf_name])  # Fetch last 1 day's data
+    if rates is not None:
+        save_csv(rates, filepath)
+        print(f"Saved {tf_name} data for {full_symbol} to {filepath}")
+
+def collect_data():
+    """Fetch and save the data of every mapped symbol over an already open MT5 connection."""
     # Get the list of all available symbols in the broker
     full_symbols = get_full_symbol_list()
 
@@ -95,25 +136,30 @@ def main():
     print("Mapped Symbols:", mapped_symbols)
 
     # Create the main output folder if it doesn't exist
-    if not os.path.exists(OUTPUT_FOLDER):
-        os.mkdir(OUTPUT_FOLDER)
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+    tasks = []
     for base_pair, full_symbol in mapped_symbols.items():
-        # Create a folder for each currency pair
+        # Create a folder for each currency pair before any download starts
         pair_folder = os.path.join(OUTPUT_FOLDER, base_pair)
-        if not os.path.exists(pair_folder):
-            os.mkdir(pair_folder)
+        os.makedirs(pair_folder, exist_ok=True)
 
         for tf_name, tf_value in TIMEFRAMES.items():
             # Define file name and path for each timeframe
             filename = f"{tf_name}.csv"
             filepath = os.path.join(pair_folder, filename)
+            tasks.append((full_symbol, tf_name, tf_value, filepath))
+
+    # The downloads are I/O-bound, so run them in parallel threads
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(lambda task: fetch_and_save(*task), tasks))
+
+def main():
+    """Main function to fetch and save data."""
+    if not connect_mt5():
+        return
 
-            print(f"Fetching {full_symbol} data for {tf_name}")
-            df = fetch_data(full_symbol, tf_value, days=1)  # Fetch last 1 day's data
-            if df is not None:
-                save_csv(df, filepath)
-                print(f"Saved {tf_name} data for {full_symbol} to {filepath}")
+    collect_data()
 
     mt5.shutdown()
     print("MT5 connection closed.")